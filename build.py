@@ -7,31 +7,55 @@ import subprocess
 from pathlib import Path
 
 
-def build_executable():
+# Modules the headless build never needs; excluding them keeps the bundle small
+HEADLESS_EXCLUDES = ["tkinter", "_tkinter", "PIL"]
+
+
+def build_executable(headless: bool = False):
     """Build the executable using PyInstaller"""
     print("Building RBXMX to Rojo Converter executable...")
     
     # Get paths
     current_dir = Path(__file__).parent
     src_dir = current_dir / "src"
-    main_file = src_dir / "main.py"
     
     # PyInstaller command
-    cmd = [
-        "pyinstaller",
-        "--onefile",  # Create a single executable file
-        "--windowed",  # GUI application (no console window)
-        "--name=rbxmx-to-rojo",  # Name of the executable
-        "--clean",  # Clean cache before building
-        str(main_file)
-    ]
+    if headless:
+        cmd = [
+            "pyinstaller",
+            "--onedir",  # No self-extraction on every start
+            "--console",  # Command line application
+            "--name=rbxmx-to-rojo-cli",  # Name of the executable
+            "--clean",  # Clean cache before building
+            f"--paths={src_dir}",  # Lazily imported modules live next to cli.py
+            "--hidden-import=parser",
+            "--hidden-import=binary_parser",
+            "--hidden-import=spill_store",
+            "--hidden-import=instance_index",
+            "--hidden-import=daemon",
+            "--hidden-import=defaults",
+            "--hidden-import=rojo_builder",
+        ]
+        cmd += [f"--exclude-module={module}" for module in HEADLESS_EXCLUDES]
+        cmd.append(str(src_dir / "cli.py"))
+        executable = current_dir / "dist" / "rbxmx-to-rojo-cli" / "rbxmx-to-rojo-cli"
+    else:
+        cmd = [
+            "pyinstaller",
+            "--onefile",  # Create a single executable file
+            "--windowed",  # GUI application (no console window)
+            "--name=rbxmx-to-rojo",  # Name of the executable
+            "--clean",  # Clean cache before building
+            str(src_dir / "main.py")
+        ]
+        executable = current_dir / "dist" / "rbxmx-to-rojo"
     
     print(f"Running: {' '.join(cmd)}")
     
     try:
         result = subprocess.run(cmd, check=True, cwd=current_dir)
         print("\n✓ Build completed successfully!")
-        print(f"Executable can be found in: {current_dir / 'dist' / 'rbxmx-to-rojo.exe'}")
+        print(f"Executable can be found in: {executable}{'.exe' if sys.platform == 'win32' else ''}")
         return True
     except subprocess.CalledProcessError as e:
         print(f"\n✗ Build failed with error code {e.returncode}")
@@ -43,5 +67,5 @@ def build_executable():
 
 
 if __name__ == "__main__":
-    success = build_executable()
+    success = build_executable(headless="--headless" in sys.argv[1:])
     sys.exit(0 if success else 1)
@@ -0,0 +1,171 @@
+"""
+RBXMX/RBXLX/RBXM/RBXL to Rojo Converter - Headless command line entry point
+
+Never imports tkinter; everything beyond the standard library basics is
+imported only when the chosen command needs it.
+"""
+import time
+
+_STARTED = time.perf_counter()
+
+import os
+import sys
+import argparse
+from pathlib import Path
+from typing import List, Optional, Tuple
+from defaults import DAEMON_HOST, DAEMON_PORT, DAEMON_WORKERS
+
+
+def _process_age() -> Optional[float]:
+    """Seconds since this process was created, or None where it cannot be read
+
+    Uses /proc on Linux, so it covers interpreter start-up and, for frozen
+    builds, the PyInstaller bootloader. Resolution is one clock tick (~10 ms).
+    """
+    try:
+        with open('/proc/self/stat') as f:
+            # The command name may contain spaces; fields resume after its ')'
+            fields = f.read().rsplit(')', 1)[1].split()
+        with open('/proc/uptime') as f:
+            uptime = float(f.read().split()[0])
+        # starttime is field 22 of the stat line, i.e. index 19 after the name
+        started = int(fields[19]) / os.sysconf('SC_CLK_TCK')
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+    return max(uptime - started, 0.0)
+
+
+# Process age at the moment this module started running
+_PROCESS_AGE = _process_age()
+if _PROCESS_AGE is not None:
+    _PROCESS_AGE = max(_PROCESS_AGE - (time.perf_counter() - _STARTED), 0.0)
+
+
+class StartupProfile:
+    """Collects phase timings for --startup-profile"""
+
+    def __init__(self, enabled: bool):
+        self.enabled = enabled
+        self.phases: List[Tuple[str, float]] = []
+        if _PROCESS_AGE is not None:
+            self.phases.append(('process start', _PROCESS_AGE))
+        self.phases.append(('module imports', time.perf_counter() - _STARTED))
+        self._last = time.perf_counter()
+
+    def mark(self, phase: str):
+        """Record the time spent since the previous mark"""
+        now = time.perf_counter()
+        self.phases.append((phase, now - self._last))
+        self._last = now
+
+    def report(self):
+        """Print the collected timings to stderr"""
+        if not self.enabled:
+            return
+        total = time.perf_counter() - _STARTED + (_PROCESS_AGE or 0.0)
+        for phase, elapsed in self.phases:
+            print(f"{phase:>15}: {elapsed * 1000:8.2f} ms", file=sys.stderr)
+        print(f"{'total':>15}: {total * 1000:8.2f} ms", file=sys.stderr)
+        if _PROCESS_AGE is None:
+            print("(process start time unavailable; interpreter start-up not included)",
+                  file=sys.stderr)
+        # Report once, even when a long-running command already printed it
+        self.enabled = False
+
+
+def _convert(args: argparse.Namespace, profile: StartupProfile) -> int:
+    """Run a single conversion"""
+    from converter import RojoConverter
+    profile.mark('command imports')
+
+    input_path = Path(args.input)
+    output_path = Path(args.output) if args.output else input_path.with_suffix('')
+
+    converter = RojoConverter(str(output_path), spill_threshold=args.spill_threshold,
+                              index_path=args.index)
+    try:
+        root_instances = converter.parse(str(input_path))
+        profile.mark('parse')
+        converter.convert_instances(root_instances)
+        profile.mark('write')
+    finally:
+        converter.close()
+
+    print(f"Rojo project created at: {output_path}")
+    return 0
+
+
+def _build(args: argparse.Namespace, profile: StartupProfile) -> int:
+    """Build a place or model file from a Rojo project"""
+    from rojo_builder import RojoBuilder
+    profile.mark('command imports')
+
+    RojoBuilder(args.project, workers=args.workers).build(args.output)
+    profile.mark('build')
+
+    print(f"Roblox file created at: {args.output}")
+    return 0
+
+
+def _daemon(args: argparse.Namespace, profile: StartupProfile) -> int:
+    """Run the conversion daemon"""
+    from daemon import ConversionDaemon
+    profile.mark('command imports')
+    profile.report()
+
+    ConversionDaemon(args.host, args.port, args.workers).serve_forever()
+    return 0
+
+
+def build_arg_parser() -> argparse.ArgumentParser:
+    """Create the command line argument parser"""
+    arg_parser = argparse.ArgumentParser(
+        prog='rbxmx-to-rojo-cli',
+        description="Convert Roblox files to Rojo projects without the GUI"
+    )
+    arg_parser.add_argument('--startup-profile', action='store_true',
+                            help="Print startup and phase timings to stderr")
+    commands = arg_parser.add_subparsers(dest='command', required=True)
+
+    convert = commands.add_parser('convert', help="Convert a Roblox file to a Rojo project")
+    convert.add_argument('input', help="Input .rbxmx/.rbxlx/.rbxm/.rbxl file")
+    convert.add_argument('-o', '--output',
+                         help="Output project folder (default: input path without extension)")
+    convert.add_argument('--spill-threshold', type=int, metavar='BYTES',
+                         help="Keep script sources larger than BYTES on disk until written")
+    convert.add_argument('--index', metavar='PATH', help="Also write a SQLite instance index")
+    convert.set_defaults(handler=_convert)
+
+    build = commands.add_parser('build', help="Build a .rbxmx/.rbxlx file from a Rojo project")
+    build.add_argument('project', help="Project folder (or its src folder)")
+    build.add_argument('-o', '--output', required=True, help="Output .rbxmx/.rbxlx file")
+    build.add_argument('--workers', type=int, default=4, help="Number of source reading threads")
+    build.set_defaults(handler=_build)
+
+    daemon = commands.add_parser('daemon', help="Run the conversion daemon")
+    daemon.add_argument('--host', default=DAEMON_HOST, help="Address to listen on")
+    daemon.add_argument('--port', type=int, default=DAEMON_PORT, help="Port to listen on")
+    daemon.add_argument('--workers', type=int, default=DAEMON_WORKERS,
+                        help="Number of conversion workers")
+    daemon.set_defaults(handler=_daemon)
+
+    return arg_parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Headless entry point"""
+    args = build_arg_parser().parse_args(argv)
+    profile = StartupProfile(args.startup_profile)
+    profile.mark('arguments')
+
+    try:
+        return args.handler(args, profile)
+    except Exception as e:
+        print(f"Error: {str(e)}", file=sys.stderr)
+        return 1
+    finally:
+        profile.report()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
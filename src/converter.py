@@ -3,10 +3,14 @@ Rojo Converter - Converts parsed RBXMX/RBXLX/RBXM/RBXL instances to Rojo project
 """
 import os
 import json
+import hashlib
 from pathlib import Path
-from typing import Dict, List, Optional, Set
-from parser import RobloxInstance, RBXMXParser
-from binary_parser import RBXBinaryParser
+from typing import TYPE_CHECKING, Dict, List, Optional, Set, Tuple
+
+# Parser backends are imported lazily so headless startup only pays for what it uses
+if TYPE_CHECKING:
+    from parser import RobloxInstance, RBXMXParser
+    from binary_parser import RBXBinaryParser
 
 
 class RojoConverter:
@@ -19,52 +23,113 @@ class RojoConverter:
         'StarterGui', 'StarterPack', 'StarterPlayer', 'Teams',
         'SoundService', 'Chat', 'LocalizationService', 'TestService'
     }
+    # Lists the files the converter wrote, so later runs know what they may delete
+    MANIFEST_FILE = '.rbxmx-to-rojo.manifest.json'
     
-    def __init__(self, output_path: str):
+    def __init__(self, output_path: str, spill_threshold: Optional[int] = None,
+                 index_path: Optional[str] = None):
         self.output_path = Path(output_path)
         self.src_path = self.output_path / 'src'
         self.project_tree: Dict[str, any] = {}
-        self.parser = RBXMXParser()
-        self.binary_parser = RBXBinaryParser()
+        # Script sources above spill_threshold bytes are kept on disk until written
+        self.spill_threshold = spill_threshold
+        self._parser: Optional['RBXMXParser'] = None
+        self._binary_parser: Optional['RBXBinaryParser'] = None
+        # Written files (relative to output_path) mapped to the SHA-1 of their contents
+        self.manifest: Dict[str, str] = {}
+        # Files deleted by the last convert_instances(remove_stale=True)
+        self.removed: List[str] = []
+        # Optional SQLite instance index written alongside the project
+        self.index_path = index_path
+        # Referent -> (output path, source hash) for every instance written to disk
+        self.instance_outputs: Dict[str, Tuple[str, Optional[str]]] = {}
+    
+    @property
+    def parser(self) -> 'RBXMXParser':
+        """XML parser, imported the first time an XML file is seen"""
+        if self._parser is None:
+            from parser import RBXMXParser
+            self._parser = RBXMXParser(spill_threshold=self.spill_threshold)
+        return self._parser
+    
+    @property
+    def binary_parser(self) -> 'RBXBinaryParser':
+        """Binary parser, imported the first time a binary file is seen"""
+        if self._binary_parser is None:
+            from binary_parser import RBXBinaryParser
+            self._binary_parser = RBXBinaryParser()
+        return self._binary_parser
     
     def convert(self, rbxmx_file: str) -> bool:
         """Convert RBXMX/RBXLX/RBXM/RBXL file to Rojo project"""
         try:
-            # Determine file type
-            file_ext = Path(rbxmx_file).suffix.lower()
-            
-            # Parse the file
-            if file_ext in ['.rbxm', '.rbxl']:
-                # Try binary format
-                try:
-                    root_instances = self.binary_parser.parse_file(rbxmx_file)
-                except NotImplementedError as e:
-                    # Binary parser not fully implemented yet
-                    raise Exception(str(e))
-            else:
-                # XML format
-                root_instances = self.parser.parse_file(rbxmx_file)
-            
-            # Create output directories
-            self.output_path.mkdir(parents=True, exist_ok=True)
-            self.src_path.mkdir(parents=True, exist_ok=True)
-            
-            # Process each root instance
-            for instance in root_instances:
-                self._process_instance(instance, self.src_path)
-            
-            # Write project file
-            self._write_project_file()
-            
-            return True
+            root_instances = self.parse(rbxmx_file)
+            return self.convert_instances(root_instances)
         except Exception as e:
             print(f"Conversion error: {str(e)}")
             raise
+        finally:
+            self.close()
+    
+    def close(self):
+        """Release parser resources such as the spill store"""
+        if self._parser is not None:
+            self._parser.close()
     
-    def _process_instance(self, instance: RobloxInstance, base_path: Path) -> Optional[Dict]:
+    def parse(self, rbxmx_file: str) -> List['RobloxInstance']:
+        """Parse RBXMX/RBXLX/RBXM/RBXL file and return its root instances"""
+        # Determine file type
+        file_ext = Path(rbxmx_file).suffix.lower()
+        
+        if file_ext in ['.rbxm', '.rbxl']:
+            # Try binary format
+            try:
+                return self.binary_parser.parse_file(rbxmx_file)
+            except NotImplementedError as e:
+                # Binary parser not fully implemented yet
+                raise Exception(str(e))
+        
+        # XML format
+        return self.parser.parse_file(rbxmx_file)
+    
+    def convert_instances(self, root_instances: List['RobloxInstance'],
+                          remove_stale: bool = False) -> bool:
+        """Write already parsed root instances out as a Rojo project
+
+        With remove_stale, files listed in the manifest of a previous
+        conversion that this one no longer produces are deleted. Files the
+        converter did not write itself are never touched.
+        """
+        self.manifest = {}
+        self.removed = []
+        self.instance_outputs = {}
+        
+        # Create output directories
+        self.output_path.mkdir(parents=True, exist_ok=True)
+        self.src_path.mkdir(parents=True, exist_ok=True)
+        
+        # Process each root instance
+        for instance in root_instances:
+            self._process_instance(instance, self.src_path)
+        
+        # Stale folders must be gone before the project file lists src/
+        if remove_stale:
+            self._remove_stale(self.load_manifest(self.output_path) or {})
+        
+        # Write project file
+        self._write_project_file()
+        self._write_manifest_file()
+        
+        if self.index_path:
+            from instance_index import InstanceIndex
+            InstanceIndex.write(self.index_path, root_instances, self.SCRIPT_CLASSES, self.instance_outputs)
+        
+        return True
+    
+    def _process_instance(self, instance: 'RobloxInstance', base_path: Path) -> Optional[Dict]:
         """Process an instance and create appropriate files/folders"""
         # Skip instances without scripts
-        if not self.parser.has_scripts(instance):
+        if not self._has_scripts(instance):
             return None
         
         class_name = instance.class_name
@@ -72,13 +137,19 @@ class RojoConverter:
         
         # Handle different class types
         if class_name in self.SCRIPT_CLASSES:
-            return self._process_script(instance, base_path)
+            result = self._process_script(instance, base_path)
         elif class_name == 'Folder':
-            return self._process_folder(instance, base_path)
+            result = self._process_folder(instance, base_path)
         else:
-            return self._process_other_instance(instance, base_path)
+            result = self._process_other_instance(instance, base_path)
+        
+        # Scripts record their source file when written; containers record their folder
+        if result is not None and str(instance.referent) not in self.instance_outputs:
+            self.instance_outputs[str(instance.referent)] = (result['$path'], None)
+        
+        return result
     
-    def _process_script(self, instance: RobloxInstance, base_path: Path) -> Optional[Dict]:
+    def _process_script(self, instance: 'RobloxInstance', base_path: Path) -> Optional[Dict]:
         """Process Script, LocalScript, or ModuleScript"""
         source = instance.properties.get('Source', '')
         script_name = instance.name
@@ -92,7 +163,7 @@ class RojoConverter:
         # ModuleScript has no extension
         
         # Count script children
-        script_children = [c for c in instance.children if self.parser.has_scripts(c)]
+        script_children = [c for c in instance.children if self._has_scripts(c)]
         total_children = len(instance.children)
         
         if len(script_children) == total_children and total_children > 0:
@@ -102,7 +173,7 @@ class RojoConverter:
             
             # Write init file
             init_file = folder_path / f'init{extension}.lua'
-            init_file.write_text(source, encoding='utf-8')
+            self._write_source(instance, init_file, source)
             
             # Process children
             for child in instance.children:
@@ -115,7 +186,7 @@ class RojoConverter:
         elif len(script_children) == 0:
             # No script children - create single file with meta
             script_file = base_path / f'{script_name}{extension}.lua'
-            script_file.write_text(source, encoding='utf-8')
+            self._write_source(instance, script_file, source)
             
             # Create meta file if there are non-script children
             if total_children > 0:
@@ -123,7 +194,7 @@ class RojoConverter:
                 meta_content = {
                     'ignoreUnknownInstances': True
                 }
-                meta_file.write_text(json.dumps(meta_content, indent=2), encoding='utf-8')
+                self._write_file(meta_file, json.dumps(meta_content, indent=2))
             
             return {
                 '$path': f'src/{script_file.relative_to(self.src_path).as_posix()}'
@@ -136,14 +207,14 @@ class RojoConverter:
             
             # Write init file
             init_file = folder_path / f'init{extension}.lua'
-            init_file.write_text(source, encoding='utf-8')
+            self._write_source(instance, init_file, source)
             
             # Write meta file
             meta_file = folder_path / 'init.meta.json'
             meta_content = {
                 'ignoreUnknownInstances': True
             }
-            meta_file.write_text(json.dumps(meta_content, indent=2), encoding='utf-8')
+            self._write_file(meta_file, json.dumps(meta_content, indent=2))
             
             # Process children
             for child in instance.children:
@@ -153,7 +224,45 @@ class RojoConverter:
                 '$path': f'src/{folder_path.relative_to(self.src_path).as_posix()}'
             }
     
-    def _process_folder(self, instance: RobloxInstance, base_path: Path) -> Optional[Dict]:
+    def _has_scripts(self, instance: 'RobloxInstance') -> bool:
+        """Check if instance or any of its descendants contain scripts"""
+        if instance.class_name in self.SCRIPT_CLASSES:
+            return True
+        
+        return any(self._has_scripts(child) for child in instance.children)
+    
+    def _write_source(self, instance: 'RobloxInstance', file_path: Path, source):
+        """Write script source, streaming it from the spill store if it was spilled"""
+        if isinstance(source, str):
+            relative_path = self._write_file(file_path, source)
+        elif hasattr(source, 'store'):
+            # SpilledSource handle; checked by attribute so spill_store stays lazily imported
+            digest = hashlib.sha1()
+            with open(file_path, 'w', encoding='utf-8') as f:
+                for chunk in source.store.iter_chunks(source):
+                    f.write(chunk)
+                    digest.update(chunk.encode('utf-8'))
+            relative_path = self._record(file_path, digest.hexdigest())
+        else:
+            raise TypeError(
+                f"Source of {instance.class_name} '{instance.name}' must be a string, "
+                f"got {type(source).__name__}"
+            )
+        
+        self.instance_outputs[str(instance.referent)] = (relative_path, self.manifest[relative_path])
+    
+    def _write_file(self, file_path: Path, content: str) -> str:
+        """Write a text file and record it in the manifest"""
+        file_path.write_text(content, encoding='utf-8')
+        return self._record(file_path, hashlib.sha1(content.encode('utf-8')).hexdigest())
+    
+    def _record(self, file_path: Path, digest: str) -> str:
+        """Add a written file to the manifest and return its relative path"""
+        relative_path = file_path.relative_to(self.output_path).as_posix()
+        self.manifest[relative_path] = digest
+        return relative_path
+    
+    def _process_folder(self, instance: 'RobloxInstance', base_path: Path) -> Optional[Dict]:
         """Process Folder instance"""
         folder_path = base_path / instance.name
         folder_path.mkdir(parents=True, exist_ok=True)
@@ -163,7 +272,7 @@ class RojoConverter:
         meta_content = {
             'ignoreUnknownInstances': True
         }
-        meta_file.write_text(json.dumps(meta_content, indent=2), encoding='utf-8')
+        self._write_file(meta_file, json.dumps(meta_content, indent=2))
         
         # Process children
         for child in instance.children:
@@ -173,10 +282,10 @@ class RojoConverter:
             '$path': f'src/{folder_path.relative_to(self.src_path).as_posix()}'
         }
     
-    def _process_other_instance(self, instance: RobloxInstance, base_path: Path) -> Optional[Dict]:
+    def _process_other_instance(self, instance: 'RobloxInstance', base_path: Path) -> Optional[Dict]:
         """Process other instance types (Models, Parts, etc.)"""
         # Only process if it has scripts
-        if not self.parser.has_scripts(instance):
+        if not self._has_scripts(instance):
             return None
         
         folder_path = base_path / instance.name
@@ -188,7 +297,7 @@ class RojoConverter:
             'className': instance.class_name,
             'ignoreUnknownInstances': True
         }
-        meta_file.write_text(json.dumps(meta_content, indent=2), encoding='utf-8')
+        self._write_file(meta_file, json.dumps(meta_content, indent=2))
         
         # Process children
         for child in instance.children:
@@ -199,6 +308,40 @@ class RojoConverter:
             '$path': f'src/{folder_path.relative_to(self.src_path).as_posix()}'
         }
     
+    @classmethod
+    def load_manifest(cls, output_path) -> Optional[Dict[str, str]]:
+        """Read the manifest a previous conversion wrote into output_path, if any"""
+        manifest_file = Path(output_path) / cls.MANIFEST_FILE
+        try:
+            files = json.loads(manifest_file.read_text(encoding='utf-8'))['files']
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+        return files if isinstance(files, dict) else None
+    
+    def _write_manifest_file(self):
+        """Record the files written by this conversion; the manifest is not listed in itself"""
+        manifest_file = self.output_path / self.MANIFEST_FILE
+        manifest_file.write_text(
+            json.dumps({'files': self.manifest}, indent=2, sort_keys=True), encoding='utf-8'
+        )
+    
+    def _remove_stale(self, previous: Dict[str, str]):
+        """Delete files from a previous conversion that this one did not write"""
+        src_root = self.src_path.resolve()
+        for relative_path in sorted(set(previous) - set(self.manifest)):
+            file_path = (self.output_path / relative_path).resolve()
+            # Only ever delete inside src/, whatever the manifest on disk says
+            if src_root not in file_path.parents or not file_path.is_file():
+                continue
+            file_path.unlink()
+            self.removed.append(relative_path)
+            
+            # Prune folders left empty, stopping at src/ itself
+            directory = file_path.parent
+            while directory != src_root and not any(directory.iterdir()):
+                directory.rmdir()
+                directory = directory.parent
+    
     def _write_project_file(self):
         """Write the default.project.json file"""
         # Build tree from src directory
@@ -218,4 +361,4 @@ class RojoConverter:
         }
         
         project_file = self.output_path / 'default.project.json'
-        project_file.write_text(json.dumps(project, indent=2), encoding='utf-8')
+        self._write_file(project_file, json.dumps(project, indent=2))
@@ -0,0 +1,327 @@
+"""
+Conversion Daemon - Keeps a warm interpreter and parsed trees between conversions
+
+Protocol: the client sends one JSON object per line and receives one JSON
+object per line in reply. Every request carries the token the daemon wrote
+to ~/.rbxmx-to-rojo/daemon-<port>.token (readable only by the current user).
+A line that is not a JSON object, or has the wrong token, closes the
+connection. Supported commands:
+
+    {"token": "...", "command": "convert", "input": "Place.rbxlx", "output": "out/Place"}
+    {"token": "...", "command": "convert", "input": "Place.rbxlx", "output": "out/Place",
+     "index": "out/Place.db"}
+    {"token": "...", "command": "diff", "input": "Place.rbxlx", "output": "out/Place"}
+    {"token": "...", "command": "status"}
+    {"token": "...", "command": "shutdown"}
+"""
+import os
+import sys
+import json
+import time
+import socket
+import hmac
+import hashlib
+import secrets
+import argparse
+import tempfile
+import threading
+import socketserver
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+from converter import RojoConverter
+from defaults import DAEMON_HOST, DAEMON_PORT, DAEMON_WORKERS, DAEMON_TOKEN_DIR
+
+if TYPE_CHECKING:
+    from parser import RobloxInstance
+
+
+def token_file_path(port: int, token_dir: Path = DAEMON_TOKEN_DIR) -> Path:
+    """Return the file holding the token of the daemon listening on port"""
+    return Path(token_dir) / f'daemon-{port}.token'
+
+
+class ConversionDaemon:
+    """Serves convert/diff/status requests from a pool of warm workers"""
+
+    def __init__(self, host: str = DAEMON_HOST, port: int = DAEMON_PORT,
+                 workers: int = DAEMON_WORKERS, max_cached_trees: int = 8,
+                 token_dir: Path = DAEMON_TOKEN_DIR):
+        self.host = host
+        self.port = port
+        self.workers = workers
+        self.max_cached_trees = max_cached_trees
+        self.started_at = time.time()
+        self.requests_served = 0
+        # Any local process (or web page) can reach the port; only holders of this token are served
+        self.token = secrets.token_urlsafe(32)
+        self.token_dir = Path(token_dir)
+        self.token_file: Optional[Path] = None
+
+        # Input path -> ((mtime_ns, size), parsed root instances)
+        self._trees: 'OrderedDict[str, Tuple[Tuple[int, int], List[RobloxInstance]]]' = OrderedDict()
+        # Output path -> manifest of the last conversion into it
+        self._manifests: Dict[str, Dict[str, str]] = {}
+        self._output_locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=workers)
+        self._server: Optional[socketserver.ThreadingTCPServer] = None
+
+    def serve_forever(self):
+        """Listen for requests until a shutdown command is received"""
+        daemon = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                for line in self.rfile:
+                    if not line.strip():
+                        continue
+                    try:
+                        request = daemon.decode(line)
+                    except ValueError as e:
+                        # Not our protocol (e.g. an HTTP request): reply once and hang up
+                        self.respond({'ok': False, 'error': str(e)})
+                        return
+                    self.respond(daemon.submit(request))
+
+            def respond(self, response: Dict[str, Any]):
+                self.wfile.write(json.dumps(response).encode('utf-8') + b'\n')
+                self.wfile.flush()
+
+        socketserver.ThreadingTCPServer.allow_reuse_address = True
+        socketserver.ThreadingTCPServer.daemon_threads = True
+        with socketserver.ThreadingTCPServer((self.host, self.port), Handler) as server:
+            self._server = server
+            # Port 0 asks the OS for a free port; report the one we got
+            self.port = server.server_address[1]
+            self.token_file = self._write_token_file()
+            print(f"Conversion daemon listening on {self.host}:{self.port}")
+            print(f"Token written to {self.token_file}")
+            try:
+                server.serve_forever()
+            finally:
+                self._pool.shutdown(wait=True)
+                self.token_file.unlink(missing_ok=True)
+
+    def _write_token_file(self) -> Path:
+        """Write the token to a file only the current user can read"""
+        self.token_dir.mkdir(mode=0o700, parents=True, exist_ok=True)
+        token_file = token_file_path(self.port, self.token_dir)
+        fd = os.open(token_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(self.token)
+        # O_CREAT's mode does not apply to a file left behind by an earlier run
+        os.chmod(token_file, 0o600)
+        return token_file
+
+    def decode(self, line: bytes) -> Dict[str, Any]:
+        """Decode and authenticate a request line, raising ValueError if it is rejected"""
+        try:
+            request = json.loads(line)
+        except ValueError as e:
+            raise ValueError(f"Invalid request: {str(e)}")
+        if not isinstance(request, dict):
+            raise ValueError("Invalid request: must be a JSON object")
+        if not hmac.compare_digest(str(request.get('token', '')), self.token):
+            raise ValueError("Invalid request: missing or wrong token")
+        return request
+
+    def submit(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Run a decoded request on the worker pool"""
+        return self._pool.submit(self.handle_request, request).result()
+
+    def handle_request(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Dispatch a single decoded request"""
+        started = time.perf_counter()
+        command = request.get('command')
+        handlers = {
+            'convert': self._convert,
+            'diff': self._diff,
+            'status': self._status,
+            'shutdown': self._shutdown,
+        }
+
+        try:
+            if command not in handlers:
+                raise ValueError(f"Unknown command: {command}")
+            response = handlers[command](request)
+            response['ok'] = True
+        except Exception as e:
+            response = {'ok': False, 'error': str(e)}
+
+        with self._lock:
+            self.requests_served += 1
+        response['elapsed_ms'] = round((time.perf_counter() - started) * 1000, 3)
+        return response
+
+    def _convert(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Convert an input file into its output folder"""
+        input_path, output_path = self._paths(request)
+        root_instances, cached = self._get_tree(input_path)
+
+        with self._output_lock(output_path):
+            previous = self._previous_manifest(output_path)
+            converter = RojoConverter(output_path, index_path=request.get('index'))
+            converter.convert_instances(root_instances, remove_stale=True)
+
+            changes = self._compare(previous, converter.manifest)
+            # Only files from a converter-written manifest are deleted; report exactly those
+            changes['removed'] = converter.removed
+            with self._lock:
+                self._manifests[output_path] = converter.manifest
+
+        response = {'cached': cached, 'files': len(converter.manifest)}
+        response.update(changes)
+        return response
+
+    def _diff(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Report which output files a conversion would add, remove or change"""
+        input_path, output_path = self._paths(request)
+        root_instances, cached = self._get_tree(input_path)
+
+        # Convert into a scratch folder with the same name so project files match
+        with tempfile.TemporaryDirectory() as scratch:
+            converter = RojoConverter(os.path.join(scratch, Path(output_path).name))
+            converter.convert_instances(root_instances)
+
+        with self._output_lock(output_path):
+            previous = self._previous_manifest(output_path)
+
+        response = {'cached': cached}
+        response.update(self._compare(previous, converter.manifest))
+        return response
+
+    def _status(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Report what the daemon currently holds in memory"""
+        with self._lock:
+            cached_trees = list(self._trees.keys())
+            manifests = sorted(self._manifests.keys())
+        return {
+            'uptime_s': round(time.time() - self.started_at, 3),
+            'requests_served': self.requests_served,
+            'workers': self.workers,
+            'cached_trees': cached_trees,
+            'manifests': manifests,
+        }
+
+    def _shutdown(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Stop the server after this response has been sent"""
+        if self._server is not None:
+            threading.Thread(target=self._server.shutdown, daemon=True).start()
+        return {}
+
+    def _paths(self, request: Dict[str, Any]) -> Tuple[str, str]:
+        """Extract absolute input and output paths from a request"""
+        input_path = request.get('input')
+        output_path = request.get('output')
+        if not input_path or not output_path:
+            raise ValueError("Both 'input' and 'output' are required")
+        return os.path.abspath(input_path), os.path.abspath(output_path)
+
+    def _get_tree(self, input_path: str) -> Tuple[List['RobloxInstance'], bool]:
+        """Return the root instances of input_path, reparsing if the file changed"""
+        stat = os.stat(input_path)
+        stamp = (stat.st_mtime_ns, stat.st_size)
+
+        with self._lock:
+            entry = self._trees.get(input_path)
+            if entry is not None and entry[0] == stamp:
+                self._trees.move_to_end(input_path)
+                return entry[1], True
+
+        # Go through the converter so file extensions are dispatched as usual
+        converter = RojoConverter(tempfile.gettempdir())
+        try:
+            root_instances = converter.parse(input_path)
+        finally:
+            converter.close()
+
+        with self._lock:
+            self._trees[input_path] = (stamp, root_instances)
+            self._trees.move_to_end(input_path)
+            while len(self._trees) > self.max_cached_trees:
+                self._trees.popitem(last=False)
+        return root_instances, False
+
+    def _output_lock(self, output_path: str) -> threading.Lock:
+        """Return the lock serialising writes into one output folder"""
+        with self._lock:
+            return self._output_locks.setdefault(output_path, threading.Lock())
+
+    def _previous_manifest(self, output_path: str) -> Dict[str, str]:
+        """Return the last known manifest of an output folder for change reporting
+
+        Falls back to the manifest file the converter wrote, then to a scan
+        of the folder. A scanned manifest is only ever used for reporting.
+        """
+        with self._lock:
+            previous = self._manifests.get(output_path)
+        if previous is None:
+            previous = RojoConverter.load_manifest(output_path)
+        if previous is None:
+            previous = self._scan_manifest(Path(output_path))
+        return previous
+
+    @staticmethod
+    def _scan_manifest(output_path: Path) -> Dict[str, str]:
+        """Build a manifest by hashing the converter-owned files already in an output folder"""
+        # Only the project file and src/ are written by the converter; anything
+        # else in the folder (indexes, VCS files, notes) is left alone
+        candidates = [output_path / 'default.project.json']
+        if (output_path / 'src').is_dir():
+            candidates.extend((output_path / 'src').rglob('*'))
+
+        manifest = {}
+        for file_path in candidates:
+            if file_path.is_file():
+                digest = hashlib.sha1(file_path.read_bytes()).hexdigest()
+                manifest[file_path.relative_to(output_path).as_posix()] = digest
+        return manifest
+
+    @staticmethod
+    def _compare(previous: Optional[Dict[str, str]], current: Dict[str, str]) -> Dict[str, List[str]]:
+        """Compare two manifests"""
+        previous = previous or {}
+        return {
+            'added': sorted(set(current) - set(previous)),
+            'removed': sorted(set(previous) - set(current)),
+            'changed': sorted(p for p in current if p in previous and previous[p] != current[p]),
+        }
+
+
+def send_request(request: Dict[str, Any], host: str = DAEMON_HOST,
+                 port: int = DAEMON_PORT, timeout: Optional[float] = None,
+                 token_dir: Path = DAEMON_TOKEN_DIR) -> Dict[str, Any]:
+    """Send one request to a running daemon and return its response
+
+    The token is read from the daemon's token file unless the request has one.
+    """
+    if 'token' not in request:
+        token = token_file_path(port, token_dir).read_text(encoding='utf-8').strip()
+        request = dict(request, token=token)
+
+    with socket.create_connection((host, port), timeout=timeout) as sock:
+        sock.sendall(json.dumps(request).encode('utf-8') + b'\n')
+        with sock.makefile('rb') as f:
+            line = f.readline()
+    if not line:
+        raise ConnectionError("Daemon closed the connection without replying")
+    return json.loads(line)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Daemon entry point"""
+    arg_parser = argparse.ArgumentParser(description="Run the Rojo conversion daemon")
+    arg_parser.add_argument('--host', default=DAEMON_HOST, help="Address to listen on")
+    arg_parser.add_argument('--port', type=int, default=DAEMON_PORT, help="Port to listen on")
+    arg_parser.add_argument('--workers', type=int, default=DAEMON_WORKERS,
+                            help="Number of conversion workers")
+    args = arg_parser.parse_args(argv)
+
+    ConversionDaemon(args.host, args.port, args.workers).serve_forever()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,13 @@
+"""
+Defaults shared by the conversion daemon and the command line entry point
+
+Kept free of heavy imports so cli.py can use it without loading the daemon.
+"""
+from pathlib import Path
+
+
+DAEMON_HOST = '127.0.0.1'
+DAEMON_PORT = 34872
+DAEMON_WORKERS = 4
+# Per-port token files; see daemon.token_file_path
+DAEMON_TOKEN_DIR = Path.home() / '.rbxmx-to-rojo'
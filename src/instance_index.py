@@ -0,0 +1,146 @@
+"""
+Instance Index - SQLite index of every instance written during a conversion
+
+The path column joins instance names with '.', like GetFullName, but
+escapes each name first: '\\' becomes '\\\\' and '.' becomes '\\.'. A child
+'B' of 'A' is therefore 'A.B' while a sibling named 'A.B' is 'A\\.B'.
+Use InstanceIndex.join_path to build paths for queries.
+"""
+import os
+import sqlite3
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+class InstanceIndex:
+    """Writes and queries a SQLite file describing every converted instance"""
+
+    SCHEMA = """
+        CREATE TABLE instances (
+            id INTEGER PRIMARY KEY,
+            referent TEXT NOT NULL,
+            name TEXT NOT NULL,
+            class_name TEXT NOT NULL,
+            path TEXT NOT NULL,
+            parent TEXT,
+            is_script INTEGER NOT NULL,
+            source_hash TEXT,
+            output_path TEXT
+        )
+    """
+    INDEXES = (
+        "CREATE INDEX instances_referent ON instances (referent)",
+        "CREATE INDEX instances_path ON instances (path)",
+        "CREATE INDEX instances_class_name ON instances (class_name)",
+        "CREATE INDEX instances_parent ON instances (parent)",
+    )
+    COLUMNS = ('referent', 'name', 'class_name', 'path', 'parent',
+               'is_script', 'source_hash', 'output_path')
+
+    def __init__(self, index_path: str):
+        self.index_path = index_path
+        self.connection = sqlite3.connect(index_path)
+        self.connection.row_factory = sqlite3.Row
+
+    @classmethod
+    def write(cls, index_path: str, root_instances: Iterable, script_classes: set,
+              outputs: Dict[str, Tuple[str, Optional[str]]]):
+        """Write a fresh index for a converted tree
+
+        outputs maps a referent to (output path, source hash) for every
+        instance the converter wrote to disk.
+        """
+        # Build next to the target and swap it in so readers never see a partial index
+        temp_path = f'{index_path}.tmp'
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+        try:
+            connection = sqlite3.connect(temp_path)
+            try:
+                connection.execute('PRAGMA journal_mode = OFF')
+                connection.execute('PRAGMA synchronous = OFF')
+                connection.execute(cls.SCHEMA)
+                connection.executemany(
+                    f"INSERT INTO instances ({', '.join(cls.COLUMNS)}) "
+                    f"VALUES ({', '.join('?' for _ in cls.COLUMNS)})",
+                    cls._rows(root_instances, script_classes, outputs)
+                )
+                # Creating indexes after the bulk insert is much faster than maintaining them
+                for statement in cls.INDEXES:
+                    connection.execute(statement)
+                connection.commit()
+            finally:
+                connection.close()
+
+            os.replace(temp_path, index_path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    @staticmethod
+    def escape_name(name: str) -> str:
+        """Escape an instance name for use as one segment of the path column"""
+        return name.replace('\\', '\\\\').replace('.', '\\.')
+
+    @classmethod
+    def join_path(cls, *names: str) -> str:
+        """Build a path column value from unescaped instance names"""
+        return '.'.join(cls.escape_name(name) for name in names)
+
+    @staticmethod
+    def _rows(root_instances: Iterable, script_classes: set,
+              outputs: Dict[str, Tuple[str, Optional[str]]]) -> Iterator[tuple]:
+        """Walk the tree depth-first and yield one row per instance"""
+        stack = [(instance, None, None) for instance in reversed(list(root_instances))]
+        while stack:
+            instance, parent_path, parent_referent = stack.pop()
+            referent = str(instance.referent)
+            segment = InstanceIndex.escape_name(instance.name)
+            path = f'{parent_path}.{segment}' if parent_path else segment
+            output_path, source_hash = outputs.get(referent, (None, None))
+
+            yield (
+                referent,
+                instance.name,
+                instance.class_name,
+                path,
+                parent_referent,
+                int(instance.class_name in script_classes),
+                source_hash,
+                output_path,
+            )
+
+            for child in reversed(instance.children):
+                stack.append((child, path, referent))
+
+    def get(self, referent: str) -> Optional[sqlite3.Row]:
+        """Look up an instance by referent"""
+        return self.connection.execute(
+            "SELECT * FROM instances WHERE referent = ?", (referent,)
+        ).fetchone()
+
+    def find_by_path(self, path: str) -> List[sqlite3.Row]:
+        """Find instances by escaped path, e.g. join_path('StarterGui', 'Menu', 'Handler')"""
+        return self.connection.execute(
+            "SELECT * FROM instances WHERE path = ?", (path,)
+        ).fetchall()
+
+    def find_by_class(self, class_name: str) -> List[sqlite3.Row]:
+        """Find all instances of a class"""
+        return self.connection.execute(
+            "SELECT * FROM instances WHERE class_name = ? ORDER BY path", (class_name,)
+        ).fetchall()
+
+    def scripts_under(self, path: str) -> List[sqlite3.Row]:
+        """Find all scripts that are descendants of the instance at an escaped path"""
+        # Range scan on the path index instead of LIKE, which cannot use it. Names
+        # escape '.', so only real descendants start with the unescaped separator
+        prefix = f'{path}.'
+        return self.connection.execute(
+            "SELECT * FROM instances WHERE path >= ? AND path < ? AND is_script = 1 ORDER BY path",
+            (prefix, prefix[:-1] + chr(ord('.') + 1))
+        ).fetchall()
+
+    def close(self):
+        """Close the database connection"""
+        self.connection.close()
@@ -2,9 +2,12 @@
 RBXMX/RBXLX Parser - Parses Roblox XML files and extracts instances
 """
 import xml.etree.ElementTree as ET
-from typing import Dict, List, Optional, Any
+from typing import TYPE_CHECKING, Dict, List, Optional, Any
 from dataclasses import dataclass, field
 
+if TYPE_CHECKING:
+    from spill_store import SpillStore, SpilledSource
+
 
 @dataclass
 class RobloxInstance:
@@ -20,17 +23,21 @@ class RobloxInstance:
 class RBXMXParser:
     """Parser for RBXMX/RBXLX (Roblox XML) files"""
     
-    SCRIPT_CLASSES = {'Script', 'LocalScript', 'ModuleScript'}
-    
-    def __init__(self):
+    def __init__(self, spill_threshold: Optional[int] = None):
         self.instances: Dict[str, RobloxInstance] = {}
         self.root_instances: List[RobloxInstance] = []
+        # ProtectedString values larger than this many bytes are moved to disk
+        self.spill_threshold = spill_threshold
+        self.spill_store: Optional['SpillStore'] = None
+        self._spilled: Dict[ET.Element, 'SpilledSource'] = {}
     
     def parse_file(self, file_path: str) -> List[RobloxInstance]:
         """Parse RBXMX/RBXLX file and return root instances"""
         try:
-            tree = ET.parse(file_path)
-            root = tree.getroot()
+            if self.spill_threshold is None:
+                root = ET.parse(file_path).getroot()
+            else:
+                root = self._parse_spilling(file_path)
             
             # Parse all items first
             items = root.find('Item')
@@ -45,6 +52,36 @@ class RBXMXParser:
             return self.root_instances
         except Exception as e:
             raise Exception(f"Failed to parse RBXMX file: {str(e)}")
+        finally:
+            # Release the parsed elements whether or not parsing succeeded
+            self._spilled.clear()
+    
+    def _parse_spilling(self, file_path: str) -> ET.Element:
+        """Parse incrementally, moving large sources to the spill store as they are read"""
+        if self.spill_store is None:
+            from spill_store import SpillStore
+            self.spill_store = SpillStore()
+        
+        root = None
+        for event, element in ET.iterparse(file_path, events=('start', 'end')):
+            if root is None:
+                root = element
+            if event != 'end' or element.tag != 'ProtectedString':
+                continue
+            
+            text = element.text or ''
+            # Cheap length check first; only encode when the source may be large
+            if len(text) * 4 > self.spill_threshold and len(text.encode('utf-8')) > self.spill_threshold:
+                self._spilled[element] = self.spill_store.append(text)
+                element.text = None
+        
+        return root
+    
+    def close(self):
+        """Release the spill store; spilled sources become unreadable afterwards"""
+        if self.spill_store is not None:
+            self.spill_store.close()
+            self.spill_store = None
     
     def _parse_item(self, item_element: ET.Element, parent: Optional[RobloxInstance]) -> RobloxInstance:
         """Parse an Item element recursively"""
@@ -98,7 +135,8 @@ class RBXMXParser:
                 properties[name] = float(prop.text or '0.0')
             elif prop_type == 'ProtectedString':
                 # This is usually script source code
-                properties[name] = prop.text or ''
+                spilled = self._spilled.get(prop)
+                properties[name] = spilled if spilled is not None else prop.text or ''
             elif prop_type == 'Content':
                 # Asset references
                 content_element = prop.find('url')
@@ -111,14 +149,3 @@ class RBXMXParser:
                 properties[name] = prop.text or ''
         
         return properties
-    
-    def has_scripts(self, instance: RobloxInstance) -> bool:
-        """Check if instance or any of its descendants contain scripts"""
-        if instance.class_name in self.SCRIPT_CLASSES:
-            return True
-        
-        for child in instance.children:
-            if self.has_scripts(child):
-                return True
-        
-        return False
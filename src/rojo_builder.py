@@ -0,0 +1,186 @@
+"""
+Rojo Builder - Streams a converted Rojo project back into an RBXMX/RBXLX file
+"""
+import os
+import re
+import json
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Deque, Iterator, List, Optional, TextIO, Tuple
+from xml.sax.saxutils import escape, quoteattr
+
+
+@dataclass
+class RojoNode:
+    """An instance discovered while walking the project tree"""
+    class_name: str
+    name: str
+    source_path: Optional[Path] = None
+
+
+class RojoBuilder:
+    """Builds RBXMX/RBXLX files from the layout RojoConverter produces"""
+
+    # Suffix -> class name, longest suffixes first so '.server.lua' wins over '.lua'
+    SCRIPT_SUFFIXES = (
+        ('.server.luau', 'Script'),
+        ('.client.luau', 'LocalScript'),
+        ('.server.lua', 'Script'),
+        ('.client.lua', 'LocalScript'),
+        ('.luau', 'ModuleScript'),
+        ('.lua', 'ModuleScript'),
+    )
+    HEADER = (
+        '<roblox xmlns:xmime="http://www.w3.org/2005/05/xmlmime" '
+        'xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" '
+        'xsi:noNamespaceSchemaLocation="http://www.roblox.com/roblox.xsd" version="4">\n'
+    )
+    # Carriage returns would be normalised away by XML parsers unless escaped
+    SOURCE_ENTITIES = {'\r': '&#13;'}
+    # Characters XML 1.0 does not allow at all, not even as character references
+    INVALID_XML_CHARS = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]')
+
+    def __init__(self, project_path: str, workers: int = 4, lookahead: Optional[int] = None):
+        project_path = Path(project_path)
+        # Accept either the project folder or its src folder
+        self.src_path = project_path / 'src' if (project_path / 'src').is_dir() else project_path
+        self.workers = workers
+        # Number of upcoming items whose sources may be read ahead of the writer
+        self.lookahead = lookahead or workers * 4
+        self._next_referent = 0
+
+    def build(self, output_file: str) -> bool:
+        """Write the project to output_file"""
+        if not self.src_path.is_dir():
+            raise Exception(f"Project source folder not found: {self.src_path}")
+
+        # Write next to the target and swap it in so a failed build leaves no partial file
+        temp_file = f'{output_file}.tmp'
+        try:
+            with open(temp_file, 'w', encoding='utf-8', newline='\n') as out:
+                self.write(out)
+            os.replace(temp_file, output_file)
+        finally:
+            if os.path.exists(temp_file):
+                os.remove(temp_file)
+
+        return True
+
+    def write(self, out: TextIO):
+        """Stream the project as XML into an open text file"""
+        self._next_referent = 0
+        events = self._walk(self.src_path)
+        window: Deque[Tuple[str, RojoNode, Optional[Future]]] = deque()
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            def fill():
+                while len(window) < self.lookahead:
+                    event = next(events, None)
+                    if event is None:
+                        return
+                    kind, node = event
+                    future = None
+                    if kind == 'open' and node.source_path is not None:
+                        future = pool.submit(self._read_source, node.source_path)
+                    window.append((kind, node, future))
+
+            out.write(self.HEADER)
+            depth = 1
+            fill()
+            while window:
+                kind, node, future = window.popleft()
+                if kind == 'open':
+                    source = future.result() if future is not None else None
+                    self._write_open(out, node, source, depth)
+                    depth += 1
+                else:
+                    depth -= 1
+                    out.write('\t' * depth + '</Item>\n')
+                fill()
+            out.write('</roblox>\n')
+
+    def _walk(self, directory: Path) -> Iterator[Tuple[str, RojoNode]]:
+        """Yield open/close events for the instances in a folder, depth first"""
+        for entry in self._list(directory):
+            node, child_directory = self._classify(entry)
+            if node is None:
+                continue
+            # Names and meta.json class names end up in the XML too
+            self._check_xml_text(node.name + node.class_name, entry)
+
+            yield ('open', node)
+            if child_directory is not None:
+                yield from self._walk(child_directory)
+            yield ('close', node)
+
+    @staticmethod
+    def _list(directory: Path) -> List[Path]:
+        """List a folder in a stable order, skipping entries that are not instances
+
+        Skips files describing the folder itself, hidden entries such as .git,
+        and symlinked folders, which could otherwise loop forever.
+        """
+        with os.scandir(directory) as entries:
+            names = sorted(
+                entry.name for entry in entries
+                if not entry.name.startswith('.')
+                and not (entry.is_symlink() and entry.is_dir())
+                and not (entry.name.startswith('init.') and entry.is_file())
+            )
+        return [directory / name for name in names]
+
+    def _classify(self, path: Path) -> Tuple[Optional[RojoNode], Optional[Path]]:
+        """Map a path to the instance it represents and the folder holding its children"""
+        if path.is_dir():
+            for suffix, class_name in self.SCRIPT_SUFFIXES:
+                init_file = path / f'init{suffix}'
+                if init_file.is_file():
+                    return RojoNode(class_name, path.name, init_file), path
+
+            class_name = 'Folder'
+            meta_file = path / 'init.meta.json'
+            if meta_file.is_file():
+                meta = json.loads(meta_file.read_text(encoding='utf-8'))
+                class_name = meta.get('className', class_name)
+            return RojoNode(class_name, path.name), path
+
+        for suffix, class_name in self.SCRIPT_SUFFIXES:
+            if path.name.endswith(suffix):
+                return RojoNode(class_name, path.name[:-len(suffix)], path), None
+
+        # meta.json files and anything Rojo would not turn into an instance
+        return None, None
+
+    @classmethod
+    def _read_source(cls, source_path: Path) -> str:
+        """Read a script source exactly as stored on disk"""
+        source = source_path.read_bytes().decode('utf-8')
+        cls._check_xml_text(source, source_path)
+        return source
+
+    @classmethod
+    def _check_xml_text(cls, text: str, path: Path):
+        """Refuse text that cannot be written as well-formed XML"""
+        match = cls.INVALID_XML_CHARS.search(text)
+        if match is not None:
+            raise Exception(
+                f"{path} contains character U+{ord(match.group()):04X}, "
+                f"which cannot be stored in an XML file"
+            )
+
+    def _write_open(self, out: TextIO, node: RojoNode, source: Optional[str], depth: int):
+        """Write an opening Item tag and its properties"""
+        referent = f'RBX{self._next_referent:032X}'
+        self._next_referent += 1
+
+        indent = '\t' * depth
+        out.write(f'{indent}<Item class={quoteattr(node.class_name)} referent="{referent}">\n')
+        out.write(f'{indent}\t<Properties>\n')
+        out.write(f'{indent}\t\t<string name="Name">{escape(node.name)}</string>\n')
+        if source is not None:
+            out.write(f'{indent}\t\t<ProtectedString name="Source">')
+            out.write(escape(source, self.SOURCE_ENTITIES))
+            out.write('</ProtectedString>\n')
+        out.write(f'{indent}\t</Properties>\n')
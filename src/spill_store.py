@@ -0,0 +1,53 @@
+"""
+Spill Store - Disk-backed storage for large script sources
+"""
+import codecs
+import tempfile
+from dataclasses import dataclass
+from typing import Iterator
+
+
+@dataclass(frozen=True)
+class SpilledSource:
+    """Handle to a script source that was moved to a spill store"""
+    store: 'SpillStore'
+    offset: int
+    length: int
+
+
+class SpillStore:
+    """Append-only temporary file holding UTF-8 encoded script sources"""
+
+    CHUNK_SIZE = 64 * 1024
+
+    def __init__(self):
+        self._file = tempfile.TemporaryFile(mode='w+b')
+        self._end = 0
+
+    def append(self, text: str) -> SpilledSource:
+        """Write text to the end of the store and return a handle to it"""
+        data = text.encode('utf-8')
+        self._file.seek(self._end)
+        self._file.write(data)
+        handle = SpilledSource(self, self._end, len(data))
+        self._end += len(data)
+        return handle
+
+    def iter_chunks(self, handle: SpilledSource) -> Iterator[str]:
+        """Yield the decoded source in chunks of at most CHUNK_SIZE bytes"""
+        decoder = codecs.getincrementaldecoder('utf-8')()
+        remaining = handle.length
+        position = handle.offset
+        while remaining > 0:
+            self._file.seek(position)
+            data = self._file.read(min(self.CHUNK_SIZE, remaining))
+            if not data:
+                break
+            position += len(data)
+            remaining -= len(data)
+            yield decoder.decode(data, final=remaining <= 0)
+
+    def close(self):
+        """Close and delete the underlying temporary file"""
+        if not self._file.closed:
+            self._file.close()